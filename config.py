@@ -4,6 +4,25 @@ Copyright (c) 2025 Calmic Sdn Bhd. All rights reserved.
 """
 import os
 from datetime import timedelta
+from sqlalchemy.pool import StaticPool
+
+def _engine_options(database_uri):
+    """Build SQLAlchemy engine options for the given database URI"""
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': 300,
+    }
+    
+    if database_uri.startswith(('postgresql://', 'postgresql+psycopg2://')):
+        # psycopg2 fast execution helpers: collapse executemany() calls into
+        # multi-row INSERT ... VALUES / batched UPDATE statements
+        options.update({
+            'executemany_mode': 'values_plus_batch',
+            'executemany_batch_page_size': 500,
+            'insertmanyvalues_page_size': 1000,
+        })
+    
+    return options
 
 class Config:
     """Base configuration class"""
@@ -19,10 +38,7 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'photovault.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-    }
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
     
     # File Upload Configuration
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'photovault/static/uploads')
@@ -42,6 +58,13 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     
+    # Cache Configuration. Only a shared backend is safe: invalidation runs in
+    # the worker that handled the write, so a per-process cache would serve
+    # stale data from the other workers. Without Redis, caching is disabled.
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_TYPE = 'RedisCache' if CACHE_REDIS_URL else 'NullCache'
+    CACHE_DEFAULT_TIMEOUT = 60
+    
     # Application Configuration
     POSTS_PER_PAGE = 12  # Photos per page in gallery
     LANGUAGES = ['en', 'ms']  # English and Malay
@@ -49,6 +72,9 @@ class Config:
     # Logging Configuration
     LOG_TO_STDOUT = os.environ.get('LOG_TO_STDOUT')
     
+    # Report per-request SQL query count and time in a Server-Timing header
+    SQL_SERVER_TIMING = os.environ.get('SQL_SERVER_TIMING', 'false').lower() in ['true', 'on', '1']
+    
     @staticmethod
     def init_app(app):
         """Initialize app-specific configuration"""
@@ -61,12 +87,20 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     WTF_CSRF_SSL_STRICT = False  # Disable SSL strict mode for development
+    SQL_SERVER_TIMING = True
     
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # One private in-memory connection per app; pre-ping/recycle would only add round trips
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
     WTF_CSRF_ENABLED = False
+    CACHE_TYPE = 'NullCache'
+    SQL_SERVER_TIMING = True
 
 class ProductionConfig(Config):
     """Production configuration"""
@@ -86,6 +120,7 @@ class ProductionConfig(Config):
         # Fallback to SQLite for production when no DATABASE_URL is set
         basedir = os.path.abspath(os.path.dirname(__file__))
         SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'photovault.db')
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
     
     @staticmethod
     def init_app(app):
@@ -0,0 +1,34 @@
+"""Cascade photo rows when their user is deleted
+
+Revision ID: b7e2d9c1f4a8
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-15 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9c1f4a8'
+down_revision = 'a3f1c2d4e5b6'
+branch_labels = None
+depends_on = None
+
+# Matches PostgreSQL's default FK name and lets SQLite batch mode name the
+# originally unnamed constraint
+naming_convention = {
+    'fk': '%(table_name)s_%(column_0_name)s_fkey',
+}
+
+
+def upgrade():
+    with op.batch_alter_table('photo', schema=None, naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint('photo_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('photo_user_id_fkey', 'user', ['user_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('photo', schema=None, naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint('photo_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('photo_user_id_fkey', 'user', ['user_id'], ['id'])
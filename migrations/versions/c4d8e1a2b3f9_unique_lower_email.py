@@ -0,0 +1,28 @@
+"""Make user emails unique case-insensitively
+
+Revision ID: c4d8e1a2b3f9
+Revises: b7e2d9c1f4a8
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e1a2b3f9'
+down_revision = 'b7e2d9c1f4a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Normalise stored emails first; fails if two accounts differ only by case
+    op.execute(sa.text('UPDATE "user" SET email = lower(email) WHERE email <> lower(email)'))
+    op.drop_index('ix_user_email_lower', table_name='user')
+    op.create_index('uq_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_user_email_lower', table_name='user')
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
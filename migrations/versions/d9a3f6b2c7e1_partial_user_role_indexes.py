@@ -0,0 +1,33 @@
+"""Add partial indexes for admin and superuser lookups
+
+Revision ID: d9a3f6b2c7e1
+Revises: c4d8e1a2b3f9
+Create Date: 2026-10-15 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a3f6b2c7e1'
+down_revision = 'c4d8e1a2b3f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_is_admin', 'user', ['id'], unique=False,
+                        postgresql_where=sa.text('is_admin'), sqlite_where=sa.text('is_admin'),
+                        postgresql_concurrently=True)
+        op.create_index('ix_user_is_superuser', 'user', ['id'], unique=False,
+                        postgresql_where=sa.text('is_superuser'), sqlite_where=sa.text('is_superuser'),
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_is_superuser', table_name='user', postgresql_concurrently=True)
+        op.drop_index('ix_user_is_admin', table_name='user', postgresql_concurrently=True)
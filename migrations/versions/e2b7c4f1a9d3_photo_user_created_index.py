@@ -0,0 +1,33 @@
+"""Add composite indexes for per-user photo listings
+
+Revision ID: e2b7c4f1a9d3
+Revises: d9a3f6b2c7e1
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c4f1a9d3'
+down_revision = 'd9a3f6b2c7e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    with op.get_context().autocommit_block():
+        op.create_index('ix_photo_user_created', 'photo', ['user_id', sa.text('created_at DESC')],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_photo_user_edited', 'photo', ['user_id', 'edited_filename'], unique=False,
+                        postgresql_where=sa.text('edited_filename IS NOT NULL'),
+                        sqlite_where=sa.text('edited_filename IS NOT NULL'),
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_photo_user_edited', table_name='photo', postgresql_concurrently=True)
+        op.drop_index('ix_photo_user_created', table_name='photo', postgresql_concurrently=True)
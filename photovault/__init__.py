@@ -1,51 +1,77 @@
 # photovault/__init__.py
 
-from flask import Flask
-from photovault.extensions import db, login_manager, migrate, csrf
+import time
+from flask import Flask, g, has_request_context
+from sqlalchemy import event, inspect
+from photovault.extensions import db, login_manager, migrate, csrf, cache
 from config import config, get_config
 import os
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for concurrent reads and cheaper commits"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def _record_query_start(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the per-statement execution context, so a failed statement
+    # leaves nothing behind on the connection
+    context._query_start_time = time.perf_counter()
+
+def _record_query_end(conn, cursor, statement, parameters, context, executemany):
+    """Add the finished statement to the current request's SQL count and time"""
+    elapsed = time.perf_counter() - context._query_start_time
+    if has_request_context():
+        g.sql_count = g.get('sql_count', 0) + 1
+        g.sql_time = g.get('sql_time', 0.0) + elapsed
+
 def _create_superuser_if_needed(app):
     """Create superuser account from environment variables if no superuser exists"""
     from photovault.models import User
     
+    # Get superuser credentials from environment variables; without them
+    # there is nothing to bootstrap, so skip the database round trip
+    username = os.environ.get('PHOTOVAULT_SUPERUSER_USERNAME')
+    email = os.environ.get('PHOTOVAULT_SUPERUSER_EMAIL', '').strip().lower()
+    password = os.environ.get('PHOTOVAULT_SUPERUSER_PASSWORD')
+    
+    if not (username and email and password):
+        return
+    
     # Check if any superuser already exists
     if User.query.filter_by(is_superuser=True).first():
         return
-        
-    # Get superuser credentials from environment variables
-    username = os.environ.get('PHOTOVAULT_SUPERUSER_USERNAME')
-    email = os.environ.get('PHOTOVAULT_SUPERUSER_EMAIL')
-    password = os.environ.get('PHOTOVAULT_SUPERUSER_PASSWORD')
     
-    if username and email and password:
-        try:
-            # Check if user with same username or email already exists
-            existing_user = User.query.filter(
-                (User.username == username) | (User.email == email)
-            ).first()
-            
-            if existing_user:
-                # Make existing user a superuser
-                existing_user.is_superuser = True
-                existing_user.is_admin = True
-                db.session.commit()
-                app.logger.info(f"Made existing user {existing_user.username} a superuser")
-            else:
-                # Create new superuser
-                superuser = User(
-                    username=username,
-                    email=email,
-                    is_admin=True,
-                    is_superuser=True
-                )
-                superuser.set_password(password)
-                db.session.add(superuser)
-                db.session.commit()
-                app.logger.info(f"Created superuser account: {username}")
-        except Exception as e:
-            app.logger.error(f"Failed to create superuser: {str(e)}")
-            db.session.rollback()
+    try:
+        # Check if user with same username or email already exists
+        existing_user = User.query.filter(
+            (User.username == username) | (db.func.lower(User.email) == email)
+        ).first()
+        
+        if existing_user:
+            # Make existing user a superuser
+            existing_user.is_superuser = True
+            existing_user.is_admin = True
+            db.session.commit()
+            app.logger.info(f"Made existing user {existing_user.username} a superuser")
+        else:
+            # Create new superuser
+            superuser = User(
+                username=username,
+                email=email,
+                is_admin=True,
+                is_superuser=True
+            )
+            superuser.set_password(password)
+            db.session.add(superuser)
+            db.session.commit()
+            app.logger.info(f"Created superuser account: {username}")
+    except Exception as e:
+        app.logger.error(f"Failed to create superuser: {str(e)}")
+        db.session.rollback()
 
 def create_app(config_class=None):
     """Application factory"""
@@ -68,6 +94,12 @@ def create_app(config_class=None):
     login_manager.init_app(app)
     migrate.init_app(app, db)
     csrf.init_app(app)
+    cache.init_app(app)
+    
+    # WAL lets readers proceed while a writer commits; applied per connection
+    with app.app_context():
+        if db.engine.url.drivername.startswith('sqlite'):
+            event.listen(db.engine, 'connect', _set_sqlite_pragmas)
     
     # Login manager configuration
     login_manager.login_view = 'auth.login'
@@ -77,7 +109,23 @@ def create_app(config_class=None):
     @login_manager.user_loader
     def load_user(user_id):
         from photovault.models import User
-        return User.query.get(int(user_id))
+        # Flask-Login memoizes the result on g for the rest of the request
+        return db.session.get(User, int(user_id))
+    
+    # Surface per-request SQL volume so N+1 regressions show up in browser
+    # dev tools and test responses
+    if app.config.get('SQL_SERVER_TIMING'):
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', _record_query_start)
+            event.listen(db.engine, 'after_cursor_execute', _record_query_end)
+        
+        @app.after_request
+        def add_sql_server_timing(response):
+            sql_time_ms = g.get('sql_time', 0.0) * 1000
+            response.headers.add(
+                'Server-Timing', f'sql;dur={sql_time_ms:.1f};desc="{g.get("sql_count", 0)} queries"'
+            )
+            return response
     
     # Register blueprints
     from photovault.routes.main import main_bp
@@ -94,9 +142,13 @@ def create_app(config_class=None):
     app.register_blueprint(superuser_bp, url_prefix='/superuser')
     app.register_blueprint(photo_bp)
     
-    # Create database tables
+    # Create database tables in a single transaction. An existing user table
+    # means the schema is already in place (later changes go through
+    # migrations), so skip create_all's per-table existence checks
     with app.app_context():
-        db.create_all()
+        with db.engine.begin() as connection:
+            if not inspect(connection).has_table('user'):
+                db.metadata.create_all(bind=connection)
         
         # Bootstrap superuser account if environment variables are set
         _create_superuser_if_needed(app)
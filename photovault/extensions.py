@@ -7,9 +7,11 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
+from flask_caching import Cache
 
 # Initialize extensions as singletons
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
-csrf = CSRFProtect()
\ No newline at end of file
+csrf = CSRFProtect()
+cache = Cache()
\ No newline at end of file
@@ -4,8 +4,8 @@ Complete models for User, Photo, Album, Person, and PhotoPerson management
 """
 from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from photovault.extensions import db
+from photovault.utils.passwords import hash_password, verify_password
 
 class User(UserMixin, db.Model):
     """User model for authentication"""
@@ -21,17 +21,26 @@ class User(UserMixin, db.Model):
     is_superuser = db.Column(db.Boolean, default=False, nullable=False)
     
     # Relationships
-    photos = db.relationship('Photo', backref='user', lazy=True, cascade='all, delete-orphan')
+    # Dynamic so user.photos is a query that can be filtered/paginated, not a full load
+    photos = db.relationship('Photo', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     albums = db.relationship('Album', backref='user', lazy=True, cascade='all, delete-orphan')
     people = db.relationship('Person', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Emails are unique case-insensitively; the expression index also backs lower(email) lookups
+        db.Index('uq_user_email_lower', db.func.lower(email), unique=True),
+        # Partial indexes: only the few admin/superuser rows are indexed
+        db.Index('ix_user_is_admin', 'id', postgresql_where=is_admin, sqlite_where=is_admin),
+        db.Index('ix_user_is_superuser', 'id', postgresql_where=is_superuser, sqlite_where=is_superuser),
+    )
+    
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -63,7 +72,8 @@ class Album(db.Model):
     @property
     def photo_count(self):
         """Return number of photos in album"""
-        return len(self.photos)
+        # COUNT in the database instead of loading every photo just to len() it
+        return db.session.query(db.func.count(Photo.id)).filter(Photo.album_id == self.id).scalar()
 
 class Person(db.Model):
     """Person model for tagging people in photos"""
@@ -95,7 +105,7 @@ class Photo(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     album_id = db.Column(db.Integer, db.ForeignKey('album.id'), nullable=True)
     
     # Enhanced fields for old photograph digitization
@@ -122,13 +132,43 @@ class Photo(db.Model):
     paired_photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'))
     is_back_side = db.Column(db.Boolean, nullable=False, default=False)
     
-    # Many-to-many relationship with people through PhotoPerson association
-    people = db.relationship('Person', secondary='photo_people', lazy='subquery',
+    # Many-to-many relationship with people through PhotoPerson association.
+    # selectin loads tags for a whole result set with one IN query on photo ids
+    # rather than re-running the parent query as a subquery
+    people = db.relationship('Person', secondary='photo_people', lazy='selectin',
                            backref=db.backref('photos', lazy=True))
     
+    __table_args__ = (
+        # Per-user listings filter on user_id and sort newest first; this turns
+        # "recent N" and paginated pages into an index range scan
+        db.Index('ix_photo_user_created', 'user_id', created_at.desc()),
+        # Partial index covering only edited photos, for edited-photo counts
+        db.Index('ix_photo_user_edited', 'user_id', 'edited_filename',
+                 postgresql_where=edited_filename.isnot(None),
+                 sqlite_where=edited_filename.isnot(None)),
+    )
+    
     def __repr__(self):
         return f'<Photo {self.filename}>'
-    
+
+    @classmethod
+    def bulk_create(cls, rows, chunk_size=1000):
+        """Insert many photos from plain dicts in one transaction
+
+        Rows are sent as executemany batches instead of per-object INSERTs.
+        Column defaults still apply, but ORM events and relationship cascades
+        do not fire and no Photo instances are returned.
+        """
+        from photovault.utils.stats import invalidate_user_photo_stats
+        
+        for start in range(0, len(rows), chunk_size):
+            db.session.bulk_insert_mappings(cls, rows[start:start + chunk_size])
+        db.session.commit()
+        
+        for user_id in {row['user_id'] for row in rows}:
+            invalidate_user_photo_stats(user_id)
+        return len(rows)
+
     @property
     def file_size_mb(self):
         """Return file size in MB"""
@@ -1,9 +1,10 @@
 # photovault/routes/admin.py
 from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, current_app, jsonify
 from flask_login import login_required, current_user
-from sqlalchemy import func, case, text
+from sqlalchemy import func, case
 from photovault import db
 from photovault.models import User, Photo
+from photovault.utils.stats import invalidate_user_photo_stats
 from datetime import datetime, timedelta
 import os
 import logging
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Filenames listed in a single batched flash message before summarising the rest
+MAX_FLASHED_FILENAMES = 5
+
 def superuser_required(f):
     """Decorator to require superuser access"""
     def wrap(*args, **kwargs):
@@ -44,26 +48,24 @@ def dashboard():
     # Get all users
     users = User.query.order_by(User.created_at.desc()).all()
     
-    # Calculate statistics for each user manually (no complex SQLAlchemy)
+    # Per-user photo statistics in one GROUP BY instead of one query per user
+    photo_stats = {
+        user_id: (total_photos, edited_photos, total_size)
+        for user_id, total_photos, edited_photos, total_size in db.session.query(
+            Photo.user_id,
+            func.count(Photo.id),
+            func.count(Photo.edited_filename),
+            func.coalesce(func.sum(Photo.file_size), 0)
+        ).group_by(Photo.user_id).all()
+    }
+    
     users_with_stats = []
     total_storage_all = 0
     total_photos_all = 0
     total_edited_all = 0
     
     for user in users:
-        # Get user's photos
-        user_photos = Photo.query.filter_by(user_id=user.id).all()
-        
-        # Calculate stats manually
-        total_photos = len(user_photos)
-        edited_photos = 0
-        total_size = 0
-        
-        for photo in user_photos:
-            if photo.edited_filename is not None:
-                edited_photos += 1
-            if photo.file_size:
-                total_size += photo.file_size
+        total_photos, edited_photos, total_size = photo_stats.get(user.id, (0, 0, 0))
         
         # Add to totals
         total_storage_all += total_size
@@ -91,36 +93,12 @@ def dashboard():
 @admin_required
 def api_statistics():
     """JSON API endpoint for dashboard statistics"""
-    # Get all users
-    users = User.query.order_by(User.created_at.desc()).all()
-    
-    # Calculate statistics for each user manually 
-    total_storage_all = 0
-    total_photos_all = 0
-    total_edited_all = 0
-    
-    for user in users:
-        # Get user's photos
-        user_photos = Photo.query.filter_by(user_id=user.id).all()
-        
-        # Calculate stats manually
-        total_photos = len(user_photos)
-        edited_photos = 0
-        total_size = 0
-        
-        for photo in user_photos:
-            if photo.edited_filename is not None:
-                edited_photos += 1
-            if photo.file_size:
-                total_size += photo.file_size
-        
-        # Add to totals
-        total_storage_all += total_size
-        total_photos_all += total_photos
-        total_edited_all += edited_photos
-    
-    # Overall statistics
-    total_users = len(users)
+    total_users = db.session.query(func.count(User.id)).scalar()
+    total_photos_all, total_edited_all, total_storage_all = db.session.query(
+        func.count(Photo.id),
+        func.count(Photo.edited_filename),
+        func.coalesce(func.sum(Photo.file_size), 0)
+    ).one()
     
     stats = {
         'total_users': total_users,
@@ -140,18 +118,13 @@ def user_detail(user_id):
     user = User.query.get_or_404(user_id)
     
     # Get user's photos
-    photos = Photo.query.filter_by(user_id=user_id).order_by(Photo.uploaded_at.desc()).all()
+    photos = Photo.query.filter_by(user_id=user_id).order_by(Photo.created_at.desc()).all()
     
-    # Calculate statistics manually
+    # The page lists every photo anyway, so count from the loaded rows; this
+    # needs no extra query and always agrees with the list
     total_photos = len(photos)
-    edited_photos = 0
-    total_size = 0
-    
-    for photo in photos:
-        if photo.edited_filename is not None:
-            edited_photos += 1
-        if photo.file_size:
-            total_size += photo.file_size
+    edited_photos = sum(1 for photo in photos if photo.edited_filename is not None)
+    total_size = sum(photo.file_size or 0 for photo in photos)
     
     user_stats = {
         'total_photos': total_photos,
@@ -169,11 +142,9 @@ def user_detail(user_id):
 @admin_required
 def edit_user(user_id):
     """Edit user information"""
-    user = User.query.get_or_404(user_id)
-    
     if request.method == 'POST':
         new_username = request.form.get('username', '').strip()
-        new_email = request.form.get('email', '').strip()
+        new_email = request.form.get('email', '').strip().lower()
         
         # Validate input
         if not new_username or not new_email:
@@ -183,21 +154,27 @@ def edit_user(user_id):
         # Check if username or email is taken by another user
         existing_user = User.query.filter(
             User.id != user_id,
-            (User.username == new_username) | (User.email == new_email)
+            (User.username == new_username) | (func.lower(User.email) == new_email)
         ).first()
         
         if existing_user:
             flash("Username or email already exists.", "danger")
             return redirect(url_for('admin.edit_user', user_id=user_id))
         
-        # Update user information
-        user.username = new_username
-        user.email = new_email
-        
+        # Update user information in a single UPDATE; the row is never loaded,
+        # so a missing user shows up as zero matched rows
+        updated = User.query.filter_by(id=user_id).update({
+            'username': new_username,
+            'email': new_email
+        })
         db.session.commit()
+        if not updated:
+            abort(404)
+        
         flash(f"User information updated successfully.", "success")
         return redirect(url_for('admin.user_detail', user_id=user_id))
     
+    user = User.query.get_or_404(user_id)
     return render_template('admin/edit_user.html', user=user)
 
 @admin_bp.route('/user/<int:user_id>/reset-password', methods=['POST'])
@@ -277,7 +254,9 @@ def delete_user(user_id):
 
     username = user.username
     
-    # Delete user's photos from the filesystem
+    # Delete user's photos from the filesystem, collecting failures so they
+    # are reported in one flash message rather than one per file
+    failed_files = []
     for photo in user.photos:
         # Delete original file
         filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], photo.filename)
@@ -285,7 +264,8 @@ def delete_user(user_id):
             try:
                 os.remove(filepath)
             except OSError as e:
-                print(f"Error deleting file {filepath}: {e}")
+                logger.error(f"Error deleting file {filepath}: {e}")
+                failed_files.append(photo.filename)
         
         # Delete edited file if it exists
         if photo.edited_filename:
@@ -294,11 +274,22 @@ def delete_user(user_id):
                 try:
                     os.remove(edited_filepath)
                 except OSError as e:
-                    print(f"Error deleting edited file {edited_filepath}: {e}")
+                    logger.error(f"Error deleting edited file {edited_filepath}: {e}")
+                    failed_files.append(photo.edited_filename)
     
     db.session.delete(user)
     db.session.commit()
+    invalidate_user_photo_stats(user_id)
     flash(f"User {username} and all their photos deleted successfully.", "success")
+    
+    if failed_files:
+        # Name only the first few files; the session cookie holds flashes and is capped at ~4KB
+        shown = ', '.join(failed_files[:MAX_FLASHED_FILENAMES])
+        more = len(failed_files) - MAX_FLASHED_FILENAMES
+        if more > 0:
+            shown += f" and {more} more"
+        flash(f"Could not remove {len(failed_files)} file(s) from disk: {shown}.", "warning")
+    
     return redirect(url_for('admin.dashboard'))
 
 @admin_bp.route('/photo/<int:photo_id>/delete', methods=['POST'])
@@ -327,6 +318,7 @@ def delete_photo(photo_id):
     
     db.session.delete(photo)
     db.session.commit()
+    invalidate_user_photo_stats(user_id)
     
     flash("Photo deleted successfully.", "success")
     return redirect(url_for('admin.user_detail', user_id=user_id))
@@ -335,54 +327,36 @@ def delete_photo(photo_id):
 @login_required
 @admin_required
 def statistics():
-    """View detailed system statistics with simple, reliable queries"""
+    """View detailed system statistics computed with SQL aggregates"""
     try:
-        # Simple user statistics - avoid complex aggregations
-        all_users = User.query.all()
-        total_users = len(all_users)
-        admin_users = sum(1 for user in all_users if user.is_admin)
-        superusers = sum(1 for user in all_users if user.is_superuser)
-        
-        # Recent users (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_users = 0
-        for user in all_users:
-            if user.created_at and user.created_at >= thirty_days_ago:
-                recent_users += 1
-        
-        # Simple photo statistics
-        all_photos = Photo.query.all()
-        total_photos = len(all_photos)
-        edited_photos = 0
-        total_size = 0
-        recent_uploads = 0
-        
-        for photo in all_photos:
-            if photo.edited_filename is not None:
-                edited_photos += 1
-            if photo.file_size:
-                total_size += photo.file_size
-            if photo.uploaded_at and photo.uploaded_at >= thirty_days_ago:
-                recent_uploads += 1
         
-        # Most active users - simple approach
-        user_photo_counts = {}
-        for photo in all_photos:
-            user_id = photo.user_id
-            if user_id not in user_photo_counts:
-                user_photo_counts[user_id] = 0
-            user_photo_counts[user_id] += 1
+        # User statistics - single aggregate query
+        total_users, admin_users, superusers, recent_users = db.session.query(
+            func.count(User.id),
+            func.coalesce(func.sum(case((User.is_admin, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((User.is_superuser, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((User.created_at >= thirty_days_ago, 1), else_=0)), 0)
+        ).one()
         
-        # Get top 10 most active users
-        most_active_users = []
-        for user in all_users:
-            photo_count = user_photo_counts.get(user.id, 0)
-            if photo_count > 0:
-                most_active_users.append((user.username, photo_count))
+        # Photo statistics - single aggregate query (COUNT skips NULL edited_filename)
+        total_photos, edited_photos, total_size, recent_uploads = db.session.query(
+            func.count(Photo.id),
+            func.count(Photo.edited_filename),
+            func.coalesce(func.sum(Photo.file_size), 0),
+            func.coalesce(func.sum(case((Photo.created_at >= thirty_days_ago, 1), else_=0)), 0)
+        ).one()
         
-        # Sort by photo count and take top 10
-        most_active_users.sort(key=lambda x: x[1], reverse=True)
-        most_active_users = most_active_users[:10]
+        # Top 10 most active users
+        most_active_users = [
+            (username, photo_count)
+            for username, photo_count in db.session.query(User.username, func.count(Photo.id))
+                .join(Photo, Photo.user_id == User.id)
+                .group_by(User.id, User.username)
+                .order_by(func.count(Photo.id).desc())
+                .limit(10)
+                .all()
+        ]
         
         # Create statistics dictionary
         statistics = {
@@ -408,13 +382,12 @@ def statistics():
         }
         
         logger.info(f"Statistics loaded successfully by admin {current_user.username}")
-        print(f"Statistics data: {statistics}")  # Debug output
+        logger.debug(f"Statistics data: {statistics}")
         
         return render_template('admin/statistics.html', stats=statistics)
     
     except Exception as e:
         logger.error(f"Error loading statistics: {str(e)}")
-        print(f"Statistics error: {str(e)}")  # Debug output
         
         # Provide fallback empty statistics
         fallback_stats = {
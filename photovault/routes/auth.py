@@ -13,33 +13,51 @@ CALMIC SDN BHD - "Committed to Excellence"
 
 from flask import Blueprint, render_template, request, flash, redirect, url_for, session
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 from photovault.models import User, db
+from photovault.utils.passwords import verify_password, needs_rehash
+from photovault.utils.security import may_be_logged_in
 import re
+import string
 
 auth_bp = Blueprint('auth', __name__)
 
+# Email pattern, compiled once at import
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Character classes required by the password policy
+_UPPER_CHARS = frozenset(string.ascii_uppercase)
+_LOWER_CHARS = frozenset(string.ascii_lowercase)
+_DIGIT_CHARS = frozenset(string.digits)
+
+def is_safe_username(username):
+    """Check username is non-empty ASCII letters, digits and underscores"""
+    return username.isascii() and username.replace('_', 'a').isalnum()
+
 def validate_email(email):
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_password(password):
     """Validate password strength"""
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    # One pass over the password; the class checks then only touch distinct characters
+    chars = set(password)
+    if chars.isdisjoint(_UPPER_CHARS):
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if chars.isdisjoint(_LOWER_CHARS):
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if chars.isdisjoint(_DIGIT_CHARS):
         return False, "Password must contain at least one number"
     return True, "Password is valid"
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """User login route"""
-    if current_user.is_authenticated:
+    # Anonymous visitors skip resolving current_user entirely
+    if may_be_logged_in() and current_user.is_authenticated:
         return redirect(url_for('main.dashboard'))
     
     if request.method == 'POST':
@@ -51,12 +69,23 @@ def login():
             flash('Please enter both username and password.', 'error')
             return render_template('login.html')
         
-        # Try to find user by username or email
-        user = User.query.filter(
-            (User.username == username) | (User.email == username)
-        ).first()
-        
-        if user and check_password_hash(user.password_hash, password):
+        # Try to find user by username or email (emails are stored lowercased)
+        user = User.query.options(
+            load_only(User.id, User.username, User.email, User.password_hash, User.is_active)
+        ).filter(db.or_(
+            User.username == username,
+            db.func.lower(User.email) == username.lower()
+        )).first()
+        
+        # Always run a hash verification so unknown usernames take as long as wrong passwords
+        password_ok = verify_password(user.password_hash if user else None, password)
+        
+        if user and password_ok:
+            # Upgrade legacy Werkzeug hashes to argon2 on successful login
+            if needs_rehash(user.password_hash):
+                user.set_password(password)
+                db.session.commit()
+            
             login_user(user, remember=remember)
             
             # Get next page from URL parameter
@@ -75,7 +104,7 @@ def login():
 @auth_bp.route('/register', methods=['GET', 'POST'])
 def register():
     """User registration route"""
-    if current_user.is_authenticated:
+    if may_be_logged_in() and current_user.is_authenticated:
         return redirect(url_for('main.dashboard'))
     
     if request.method == 'POST':
@@ -94,7 +123,7 @@ def register():
             flash('Username must be at least 3 characters long.', 'error')
             return render_template('register.html')
         
-        if not re.match(r'^[a-zA-Z0-9_]+$', username):
+        if not is_safe_username(username):
             flash('Username can only contain letters, numbers, and underscores.', 'error')
             return render_template('register.html')
         
@@ -113,10 +142,13 @@ def register():
             flash('Passwords do not match.', 'error')
             return render_template('register.html')
         
-        # Check if user already exists
-        existing_user = User.query.filter(
-            (User.username == username) | (User.email == email)
-        ).first()
+        # Check if user already exists. This only fetches the username, gives a
+        # specific message and skips password hashing for obvious duplicates;
+        # the unique indexes still decide races at insert time
+        existing_user = db.session.query(User.username).filter(db.or_(
+            User.username == username,
+            db.func.lower(User.email) == email
+        )).first()
         
         if existing_user:
             if existing_user.username == username:
@@ -129,9 +161,9 @@ def register():
             # Create new user
             user = User(
                 username=username,
-                email=email,
-                password_hash=generate_password_hash(password)
+                email=email
             )
+            user.set_password(password)
             
             db.session.add(user)
             db.session.commit()
@@ -139,6 +171,13 @@ def register():
             flash('Registration successful! You can now log in.', 'success')
             return redirect(url_for('auth.login'))
             
+        except IntegrityError:
+            # A concurrent registration took the username or email after the
+            # check above; the unique indexes reject the duplicate row
+            db.session.rollback()
+            flash('Username or email already registered. Please choose a different one.', 'error')
+            return render_template('register.html')
+            
         except Exception as e:
             db.session.rollback()
             flash('An error occurred during registration. Please try again.', 'error')
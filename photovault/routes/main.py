@@ -4,6 +4,10 @@ This should only contain routes, not a Flask app
 """
 from flask import Blueprint, render_template, redirect, url_for
 from flask_login import current_user, login_required
+from sqlalchemy.orm import load_only, lazyload
+from photovault.models import Photo
+from photovault.utils.stats import get_user_photo_stats, get_recent_photos
+from photovault.utils.security import may_be_logged_in
 
 # Create the main blueprint
 main_bp = Blueprint('main', __name__)
@@ -12,7 +16,8 @@ main_bp = Blueprint('main', __name__)
 @main_bp.route('/index')
 def index():
     """Home page"""
-    if current_user.is_authenticated:
+    # Anonymous visitors skip resolving current_user entirely
+    if may_be_logged_in() and current_user.is_authenticated:
         return redirect(url_for('main.dashboard'))
     return render_template('index.html')
 
@@ -45,18 +50,15 @@ def terms():
 @login_required
 def dashboard():
     """User dashboard"""
+    # current_user is a proxy; resolve the id once
+    uid = current_user.id
+    
     try:
         # Calculate photo statistics for the current user
-        from photovault.models import Photo
-        
-        total_photos = Photo.query.filter_by(user_id=current_user.id).count()
-        # For now, assume all photos are originals since there's no edited version tracking yet
-        edited_photos = 0
-        original_photos = total_photos
+        total_photos, edited_photos, total_size_bytes = get_user_photo_stats(uid)
+        original_photos = total_photos - edited_photos
         
         # Calculate total storage used (in MB)
-        photos = Photo.query.filter_by(user_id=current_user.id).all()
-        total_size_bytes = sum(photo.file_size or 0 for photo in photos)
         total_size_mb = round(total_size_bytes / 1024 / 1024, 2) if total_size_bytes > 0 else 0
         
         # Calculate storage usage percentage (assuming 1GB = 1024MB limit for demo)
@@ -72,7 +74,7 @@ def dashboard():
         }
         
         # Get recent photos for dashboard display (limit to 12 most recent)
-        recent_photos = Photo.query.filter_by(user_id=current_user.id).order_by(Photo.created_at.desc()).limit(12).all()
+        recent_photos = get_recent_photos(uid)
         
         return render_template('dashboard.html', stats=stats, photos=recent_photos)
     except Exception as e:
@@ -102,20 +104,12 @@ def profile():
     
     try:
         # Calculate user statistics
-        from photovault.models import Photo
-        from datetime import datetime
-        
-        # Get all photos for current user
-        user_photos = Photo.query.filter_by(user_id=current_user.id).all()
-        
-        # Calculate statistics
-        total_photos = len(user_photos)
-        edited_photos = sum(1 for photo in user_photos if photo.edited_filename and photo.edited_filename.strip())
-        total_size = sum(photo.file_size or 0 for photo in user_photos)
+        user = current_user._get_current_object()
+        total_photos, edited_photos, total_size = get_user_photo_stats(user.id)
         
         # Format member since date
-        if current_user.created_at:
-            member_since = current_user.created_at.strftime('%B %Y')
+        if user.created_at:
+            member_since = user.created_at.strftime('%B %Y')
         else:
             member_since = 'Unknown'
             
@@ -137,10 +131,12 @@ def profile():
 def gallery():
     """Gallery page"""
     try:
-        from photovault.models import Photo
-        
-        # Get all photos for the current user
-        photos = Photo.query.filter_by(user_id=current_user.id).order_by(Photo.created_at.desc()).all()
+        # Get all photos for the current user, loading only the columns the
+        # gallery grid renders and skipping the people tags it never shows
+        photos = Photo.query.options(
+            load_only(Photo.id, Photo.original_name, Photo.thumbnail_path, Photo.created_at),
+            lazyload(Photo.people)
+        ).filter_by(user_id=current_user.id).order_by(Photo.created_at.desc()).all()
         
         return render_template('gallery/dashboard.html', photos=photos, total_photos=len(photos))
     except Exception as e:
@@ -152,8 +148,6 @@ def gallery():
 def edit_photo(photo_id):
     """Photo editor page"""
     try:
-        from photovault.models import Photo
-        
         # Get the photo and verify ownership
         photo = Photo.query.get_or_404(photo_id)
         if photo.user_id != current_user.id:
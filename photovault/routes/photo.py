@@ -3,21 +3,24 @@ PhotoVault Enhanced Upload Route
 Handles file uploads from both traditional file selection and camera capture
 """
 import os
+import io
+import base64
 import uuid
+import secrets
 import mimetypes
 from datetime import datetime
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
-from flask import Blueprint, request, jsonify, current_app, session
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_login import login_required, current_user
-from flask_wtf.csrf import validate_csrf, CSRFError
 from photovault.extensions import csrf
 from PIL import Image
 import logging
 
 # Import your models
-from photovault.models import Photo, Album, User
+from photovault.models import Photo
 from photovault.extensions import db
+from photovault.utils.stats import invalidate_user_photo_stats
 
 # Create blueprint
 photo_bp = Blueprint('photo', __name__)
@@ -27,7 +30,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Configuration
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'tiff'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'tiff'})
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
 MAX_IMAGE_DIMENSION = 4096  # Maximum width/height
 THUMBNAIL_SIZE = (300, 300)
@@ -36,8 +39,8 @@ def allowed_file(filename):
     """Check if file extension is allowed"""
     if not filename:
         return False
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
 
 def validate_image_content(file_stream):
     """Validate that the file is actually a valid image"""
@@ -49,16 +52,17 @@ def validate_image_content(file_stream):
         logger.warning(f"Image validation failed: {str(e)}")
         return False
 
-def get_image_info(file_path):
-    """Extract image metadata"""
+def get_image_info(file_path, size_bytes=None):
+    """Extract image metadata; pass size_bytes when already known to skip a stat"""
     try:
-        with Image.open(file_path) as img:
+        # One open serves both the size (fstat on the descriptor) and the header
+        with open(file_path, 'rb') as image_file, Image.open(image_file) as img:
             return {
                 'width': img.width,
                 'height': img.height,
                 'format': img.format,
                 'mode': img.mode,
-                'size_bytes': os.path.getsize(file_path)
+                'size_bytes': size_bytes if size_bytes is not None else os.fstat(image_file.fileno()).st_size
             }
     except Exception as e:
         logger.error(f"Failed to get image info: {str(e)}")
@@ -106,12 +110,14 @@ def process_uploaded_file(file, upload_source='file'):
         file_path = os.path.join(upload_dir, safe_filename)
         thumbnail_path = os.path.join(thumbnails_dir, thumbnail_filename)
         
-        # Save original file
-        file.save(file_path)
+        # Save original file, sizing it from the write position
+        with open(file_path, 'wb') as destination:
+            file.save(destination)
+            file_size = destination.tell()
         logger.info(f"Saved file: {file_path}")
         
         # Get image information
-        image_info = get_image_info(file_path)
+        image_info = get_image_info(file_path, size_bytes=file_size)
         if not image_info:
             raise ValueError("Invalid image file")
         
@@ -140,7 +146,6 @@ def process_uploaded_file(file, upload_source='file'):
         }
         
         # Save to database  
-        from photovault.models import Photo
         photo = Photo(
             user_id=current_user.id if current_user.is_authenticated else None,
             filename=safe_filename,
@@ -155,6 +160,7 @@ def process_uploaded_file(file, upload_source='file'):
         )
         db.session.add(photo)
         db.session.commit()
+        invalidate_user_photo_stats(photo.user_id)
         
         logger.info(f"Successfully processed {upload_source} upload: {original_name}")
         return file_metadata
@@ -312,7 +318,6 @@ def get_thumbnail(file_id):
             if filename.startswith(f"thumb_{file_id}"):
                 thumbnail_path = os.path.join(thumbnails_dir, filename)
                 if os.path.exists(thumbnail_path):
-                    from flask import send_file
                     return send_file(thumbnail_path, mimetype='image/jpeg')
         
         return jsonify({'error': 'Thumbnail not found'}), 404
@@ -346,13 +351,12 @@ def list_photos():
 @login_required
 def annotate_photo(photo_id):
     """Save annotated version of a photo"""
+    uid = current_user.id
+    
     try:
-        import base64
-        import io
-        
         # Get the photo and verify ownership
         photo = Photo.query.get_or_404(photo_id)
-        if photo.user_id != current_user.id:
+        if photo.user_id != uid:
             return jsonify({'success': False, 'error': 'Access denied'}), 403
         
         # Get the annotated image data from request
@@ -372,12 +376,12 @@ def annotate_photo(photo_id):
         
         # Generate filename for edited version
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_id = str(uuid.uuid4())[:8]
+        unique_id = secrets.token_hex(4)
         base_name = os.path.splitext(photo.filename)[0]
         edited_filename = f"{base_name}_edited_{timestamp}_{unique_id}.jpg"
         
         # Create user upload directory
-        user_upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], str(current_user.id))
+        user_upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], str(uid))
         os.makedirs(user_upload_dir, exist_ok=True)
         
         # Save the edited image
@@ -396,15 +400,16 @@ def annotate_photo(photo_id):
         photo.updated_at = datetime.utcnow()
         
         db.session.commit()
+        invalidate_user_photo_stats(photo.user_id)
         
-        logger.info(f"Successfully saved annotated photo for user {current_user.id}, photo {photo_id}")
+        logger.info(f"Successfully saved annotated photo for user {uid}, photo {photo_id}")
         
         return jsonify({
             'success': True,
             'message': 'Annotated photo saved successfully',
             'edited_filename': edited_filename,
-            'thumbnail_url': f'/static/uploads/{current_user.id}/{thumbnail_filename}',
-            'edited_url': f'/static/uploads/{current_user.id}/{edited_filename}'
+            'thumbnail_url': f'/static/uploads/{uid}/{thumbnail_filename}',
+            'edited_url': f'/static/uploads/{uid}/{edited_filename}'
         })
         
     except Exception as e:
@@ -419,10 +424,12 @@ def annotate_photo(photo_id):
 @login_required
 def delete_photo(photo_id):
     """Delete a photo and its files"""
+    uid = current_user.id
+    
     try:
         # Get the photo and verify ownership
         photo = Photo.query.get_or_404(photo_id)
-        if photo.user_id != current_user.id:
+        if photo.user_id != uid:
             return jsonify({'success': False, 'error': 'Access denied'}), 403
         
         # Delete physical files
@@ -438,8 +445,9 @@ def delete_photo(photo_id):
         # Delete from database
         db.session.delete(photo)
         db.session.commit()
+        invalidate_user_photo_stats(uid)
         
-        logger.info(f"Successfully deleted photo {photo_id} for user {current_user.id}")
+        logger.info(f"Successfully deleted photo {photo_id} for user {uid}")
         
         return jsonify({
             'success': True,
@@ -12,11 +12,11 @@ CALMIC SDN BHD - "Committed to Excellence"
 """
 
 # photovault/routes/superuser.py
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
+from flask import Blueprint, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
 from photovault import db
 from photovault.models import User
-from datetime import datetime
+from photovault.utils.stats import invalidate_user_photo_stats
 
 superuser_bp = Blueprint('superuser', __name__, url_prefix='/superuser')
 
@@ -36,7 +36,10 @@ def superuser_required(f):
 @superuser_required
 def dashboard():
     """Superuser dashboard showing all users"""
-    users = User.query.order_by(User.created_at.desc()).all()
+    # Only the columns the listing shows, as plain rows rather than User objects
+    users = db.session.query(
+        User.id, User.username, User.email, User.created_at, User.is_superuser
+    ).order_by(User.created_at.desc()).all()
     return render_template('superuser/dashboard.html', users=users)
 
 @superuser_bp.route('/users/toggle_superuser/<int:user_id>', methods=['POST'])
@@ -72,5 +75,6 @@ def delete_user(user_id):
     username = user.username
     db.session.delete(user)
     db.session.commit()
+    invalidate_user_photo_stats(user_id)
     flash(f"User {username} deleted successfully.", "success")
     return redirect(url_for('superuser.dashboard'))
@@ -1,16 +1,19 @@
 # photovault/routes/upload.py
 
 import os
-import uuid
-import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app, render_template
+from flask import Blueprint, request, jsonify, render_template, current_app, send_file
 from flask_login import login_required, current_user
+from sqlalchemy import bindparam, insert, select, update
 from werkzeug.exceptions import RequestEntityTooLarge
 from photovault.utils.file_handler import (
     validate_image_file, save_uploaded_file, generate_unique_filename,
     create_thumbnail, get_image_info, delete_file_safely
 )
+from photovault.extensions import db
+from photovault.models import Photo
+from photovault.utils.stats import invalidate_user_photo_stats
 import logging
 
 # Configure logging
@@ -19,6 +22,93 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 upload_bp = Blueprint('upload', __name__)
 
+# Disk writes and PIL decode/encode release the GIL, so the files of a
+# multi-file upload are stored in parallel on a small shared pool
+UPLOAD_IO_WORKERS = 4
+_io_pool = ThreadPoolExecutor(max_workers=UPLOAD_IO_WORKERS, thread_name_prefix='upload-io')
+
+# Thumbnails are built after the response on their own pool, so a backlog of
+# thumbnail jobs never delays the synchronous save step of later uploads
+THUMBNAIL_WORKERS = 2
+_thumbnail_pool = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix='upload-thumbnail')
+
+# Core executemany UPDATE keyed on id. Unlike the ORM bulk UPDATE by primary
+# key, it does not require every row to match, so photos deleted while their
+# thumbnails were being built don't roll back the rest of the batch
+_set_thumbnail_path = update(Photo.__table__).where(
+    Photo.__table__.c.id == bindparam('b_id')
+).values(thumbnail_path=bindparam('b_thumbnail_path'))
+
+def _store_file(app, file, unique_filename, user_id):
+    """
+    Save one validated upload and read its image information
+    
+    Runs on the upload I/O pool, so it pushes its own app context.
+    
+    Returns:
+        tuple: (error_message, file_path, image_info) - error_message is None on success
+    """
+    with app.app_context():
+        try:
+            # Save file
+            success, file_path_or_error, file_size = save_uploaded_file(file, unique_filename, user_id)
+            if not success:
+                return file_path_or_error, None, None
+            
+            file_path = file_path_or_error
+            
+            # Get image information from the upload still buffered in memory
+            image_info = get_image_info(file_path, size_bytes=file_size, stream=file.stream)
+            if not image_info:
+                delete_file_safely(file_path)
+                return "Failed to read image information", None, None
+            
+            return None, file_path, image_info
+            
+        except Exception as e:
+            logger.error(f"Unexpected error processing {file.filename}: {str(e)}")
+            return "Processing failed", None, None
+
+def _create_thumbnails(app, user_id, photos):
+    """
+    Create thumbnails for newly inserted photos and record their paths
+    
+    Thumbnailing decodes the full image, so it runs on the thumbnail pool
+    after the response has been sent rather than on the request thread.
+    Thumbnails of photos deleted in the meantime are removed again.
+    
+    Args:
+        app: Application object, for the app context
+        user_id: ID of the photos' owner
+        photos: List of (photo_id, file_path) tuples
+    """
+    with app.app_context():
+        try:
+            created = {}
+            for photo_id, file_path in photos:
+                thumb_success, thumb_path_or_error = create_thumbnail(file_path)
+                if thumb_success:
+                    created[photo_id] = thumb_path_or_error
+            
+            if created:
+                db.session.execute(_set_thumbnail_path, [
+                    {'b_id': photo_id, 'b_thumbnail_path': thumbnail_path}
+                    for photo_id, thumbnail_path in created.items()
+                ])
+                remaining = set(db.session.scalars(
+                    select(Photo.id).where(Photo.id.in_(created))
+                ))
+                db.session.commit()
+                invalidate_user_photo_stats(user_id)
+                
+                # Nothing points at thumbnails of photos that no longer exist
+                for photo_id, thumbnail_path in created.items():
+                    if photo_id not in remaining:
+                        delete_file_safely(thumbnail_path)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to create thumbnails for {len(photos)} photo(s): {str(e)}")
+
 @upload_bp.route('/upload')
 @login_required
 def upload_page():
@@ -32,8 +122,11 @@ def upload_photos():
     Handle photo upload from file selection or camera capture
     Supports both single and multiple file uploads
     """
+    # current_user is a proxy; resolve the id once for the whole batch
+    user_id = current_user.id
+    
     try:
-        logger.info(f"Upload request from user: {current_user.id}")
+        logger.info(f"Upload request from user: {user_id}")
         
         # Check if files were provided
         if 'file' not in request.files:
@@ -56,9 +149,11 @@ def upload_photos():
         
         logger.info(f"Processing {len(files)} file(s) from {upload_source}")
         
-        # Process each file
+        # Validate and name each file on the request thread; these checks work on
+        # the already-buffered upload stream
         uploaded_files = []
         errors = []
+        accepted = []
         
         for file in files:
             if not file or file.filename == '':
@@ -76,78 +171,84 @@ def upload_photos():
                     file.filename, 
                     prefix='camera' if upload_source == 'camera' else 'upload'
                 )
-                
-                # Save file
-                success, file_path_or_error = save_uploaded_file(
-                    file, unique_filename, current_user.id
-                )
-                
-                if not success:
-                    errors.append(f"{file.filename}: {file_path_or_error}")
-                    continue
-                
-                file_path = file_path_or_error
-                
-                # Get image information
-                image_info = get_image_info(file_path)
-                if not image_info:
-                    delete_file_safely(file_path)
-                    errors.append(f"{file.filename}: Failed to read image information")
-                    continue
-                
-                # Create thumbnail
-                thumb_success, thumb_path_or_error = create_thumbnail(file_path)
-                thumbnail_path = thumb_path_or_error if thumb_success else None
-                
-                # Save to database
-                try:
-                    from photovault.models import Photo, db
-                    
-                    photo = Photo(
-                        user_id=current_user.id,
-                        filename=unique_filename,
-                        original_name=file.filename or f'capture_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jpg',
-                        file_path=file_path,
-                        thumbnail_path=thumbnail_path,
-                        file_size=image_info['size_bytes'],
-                        width=image_info['width'],
-                        height=image_info['height'],
-                        mime_type=image_info['mime_type'],
-                        upload_source=upload_source,
-
-                        created_at=datetime.utcnow(),
-                        updated_at=datetime.utcnow()
-                    )
-                    
-                    db.session.add(photo)
-                    db.session.commit()
-                    
-                    uploaded_files.append({
-                        'id': photo.id,
-                        'filename': unique_filename,
-                        'original_name': file.filename,
-                        'file_size': image_info['size_bytes'],
-                        'dimensions': f"{image_info['width']}x{image_info['height']}",
-                        'upload_source': upload_source,
-                        'thumbnail_url': f"/api/thumbnail/{photo.id}" if thumbnail_path else None
-                    })
-                    
-                except Exception as db_error:
-                    logger.error(f"Database error for {file.filename}: {str(db_error)}")
-                    # Clean up file if database save failed
-                    delete_file_safely(file_path)
-                    if thumbnail_path:
-                        delete_file_safely(thumbnail_path)
-                    errors.append(f"{file.filename}: Database save failed")
-                    continue
+                accepted.append((file, unique_filename))
                 
             except Exception as e:
                 logger.error(f"Unexpected error processing {file.filename}: {str(e)}")
                 errors.append(f"{file.filename}: Processing failed")
                 continue
         
+        # Save files and read image info concurrently, then collect the
+        # database rows for one batch insert
+        app = current_app._get_current_object()
+        results = _io_pool.map(
+            lambda item: _store_file(app, item[0], item[1], user_id), accepted
+        )
+        
+        pending = []
+        for (file, unique_filename), (error, file_path, image_info) in zip(accepted, results):
+            if error:
+                errors.append(f"{file.filename}: {error}")
+                continue
+            
+            now = datetime.utcnow()
+            pending.append({
+                'user_id': user_id,
+                'filename': unique_filename,
+                'original_name': file.filename or f'capture_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jpg',
+                'file_path': file_path,
+                'file_size': image_info['size_bytes'],
+                'width': image_info['width'],
+                'height': image_info['height'],
+                'mime_type': image_info['mime_type'],
+                'upload_source': upload_source,
+                'created_at': now,
+                'updated_at': now
+            })
+        
+        # Save to database as one executemany batch, with ids returned in row order
+        if pending:
+            photo_ids = []
+            try:
+                photo_ids = db.session.scalars(
+                    insert(Photo).returning(Photo.id, sort_by_parameter_order=True),
+                    pending
+                ).all()
+                db.session.commit()
+            except Exception as db_error:
+                db.session.rollback()
+                logger.error(f"Database error saving {len(pending)} file(s): {str(db_error)}")
+                # Clean up files if database save failed
+                for row in pending:
+                    delete_file_safely(row['file_path'])
+                    errors.append(f"{row['original_name']}: Database save failed")
+                pending = []
+            
+            # Thumbnails are filled in after the response; the thumbnail URL
+            # returns 404 until the background job has recorded the path
+            if photo_ids:
+                _thumbnail_pool.submit(
+                    _create_thumbnails, app, user_id,
+                    [(photo_id, row['file_path']) for row, photo_id in zip(pending, photo_ids)]
+                )
+            
+            for row, photo_id in zip(pending, photo_ids):
+                row['id'] = photo_id
+                uploaded_files.append({
+                    'id': row['id'],
+                    'filename': row['filename'],
+                    'original_name': row['original_name'],
+                    'file_size': row['file_size'],
+                    'dimensions': f"{row['width']}x{row['height']}",
+                    'upload_source': upload_source,
+                    'thumbnail_url': f"/api/thumbnail/{row['id']}",
+                    'thumbnail_pending': True
+                })
+        
         # Prepare response
         if uploaded_files:
+            invalidate_user_photo_stats(user_id)
+            
             response_data = {
                 'success': True,
                 'message': f'Successfully uploaded {len(uploaded_files)} file(s)',
@@ -187,9 +288,6 @@ def upload_photos():
 def get_thumbnail(photo_id):
     """Serve thumbnail images"""
     try:
-        from photovault.models import Photo
-        from flask import send_file
-        
         photo = Photo.query.filter_by(id=photo_id, user_id=current_user.id).first()
         if not photo or not photo.thumbnail_path:
             return jsonify({'error': 'Thumbnail not found'}), 404
@@ -1,7 +1,7 @@
 # photovault/utils/file_handler.py
 
 import os
-import uuid
+import secrets
 import mimetypes
 from datetime import datetime
 from flask import current_app
@@ -13,7 +13,11 @@ import logging
 logger = logging.getLogger(__name__)
 
 # Configuration
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'tiff'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'tiff'})
+ALLOWED_MIME_TYPES = frozenset({
+    'image/jpeg', 'image/jpg', 'image/png',
+    'image/gif', 'image/webp', 'image/bmp', 'image/tiff'
+})
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
 MAX_IMAGE_DIMENSION = 4096
 
@@ -33,18 +37,14 @@ def validate_image_file(file):
             return False, "No file provided"
         
         # Check file type by MIME type
-        allowed_types = [
-            'image/jpeg', 'image/jpg', 'image/png', 
-            'image/gif', 'image/webp', 'image/bmp', 'image/tiff'
-        ]
-        
-        if hasattr(file, 'content_type') and file.content_type not in allowed_types:
+        if hasattr(file, 'content_type') and file.content_type not in ALLOWED_MIME_TYPES:
             return False, f"Invalid file type: {file.content_type}"
         
         # Check file extension
-        file_ext = os.path.splitext(secure_filename(file.filename))[1].lower()
-        if file_ext not in [f'.{ext}' for ext in ALLOWED_EXTENSIONS]:
-            return False, f"Invalid file extension: {file_ext}"
+        _, dot, file_ext = secure_filename(file.filename).rpartition('.')
+        file_ext = file_ext.lower() if dot else ''
+        if file_ext not in ALLOWED_EXTENSIONS:
+            return False, f"Invalid file extension: {dot}{file_ext}"
         
         # Check file size
         file.seek(0, os.SEEK_END)
@@ -85,13 +85,13 @@ def save_uploaded_file(file, filename, user_id=None):
         user_id: Optional user ID for organizing files
         
     Returns:
-        tuple: (success, file_path_or_error_message)
+        tuple: (success, file_path_or_error_message, file_size)
     """
     try:
         # Get upload directory
         upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
         if not upload_folder:
-            return False, 'UPLOAD_FOLDER not configured'
+            return False, 'UPLOAD_FOLDER not configured', 0
         
         # Create user-specific subdirectory if user_id provided
         if user_id:
@@ -103,20 +103,23 @@ def save_uploaded_file(file, filename, user_id=None):
         # Create full file path
         file_path = os.path.join(upload_folder, filename)
         
-        # Save the file
-        file.save(file_path)
+        # Save the file, taking its size from the write position rather than
+        # stat()ing it again afterwards
+        with open(file_path, 'wb') as destination:
+            file.save(destination)
+            file_size = destination.tell()
         
         # Verify file was saved
-        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        if file_size > 0:
             logger.info(f'File saved successfully: {filename}')
-            return True, file_path
+            return True, file_path, file_size
         else:
-            logger.error(f'File not found after save or is empty: {filename}')
-            return False, 'File save verification failed'
+            logger.error(f'File is empty after save: {filename}')
+            return False, 'File save verification failed', 0
             
     except Exception as e:
         logger.error(f'Error saving file {filename}: {str(e)}')
-        return False, f'Save error: {str(e)}'
+        return False, f'Save error: {str(e)}', 0
 
 def generate_unique_filename(original_filename, prefix=""):
     """
@@ -137,8 +140,9 @@ def generate_unique_filename(original_filename, prefix=""):
     if not file_ext:
         file_ext = '.jpg'  # Default extension
     
-    # Generate unique name with UUID and timestamp
-    unique_id = str(uuid.uuid4().hex)[:12]
+    # Generate unique name with a random token and timestamp; token_hex is a
+    # single os.urandom call, with no UUID object to build and slice
+    unique_id = secrets.token_hex(6)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     # Combine with prefix if provided
@@ -240,26 +244,45 @@ def get_image_dimensions(file_path):
     except Exception:
         return (0, 0)
 
-def get_image_info(file_path):
+def _read_image_header(image_file, file_path, size_bytes):
+    """Build the get_image_info() dict from an open image file object"""
+    with Image.open(image_file) as image:
+        return {
+            'width': image.width,
+            'height': image.height,
+            'format': image.format,
+            'mode': image.mode,
+            'size_bytes': size_bytes,
+            'mime_type': mimetypes.guess_type(file_path)[0]
+        }
+
+def get_image_info(file_path, size_bytes=None, stream=None):
     """
     Get comprehensive image information
     
+    Only the image header is parsed; pixel data is never decoded.
+    
     Args:
         file_path: Path to image file
+        size_bytes: File size if the caller already knows it (skips a stat)
+        stream: Seekable file object holding the same bytes (e.g. the buffered
+            upload); the header is read from it instead of reopening file_path
         
     Returns:
         dict: Image information or None if error
     """
     try:
-        with Image.open(file_path) as image:
-            return {
-                'width': image.width,
-                'height': image.height,
-                'format': image.format,
-                'mode': image.mode,
-                'size_bytes': os.path.getsize(file_path),
-                'mime_type': mimetypes.guess_type(file_path)[0]
-            }
+        if stream is not None:
+            stream.seek(0)
+            if size_bytes is None:
+                size_bytes = os.path.getsize(file_path)
+            return _read_image_header(stream, file_path, size_bytes)
+        
+        # One open serves both the size (fstat on the descriptor) and the header
+        with open(file_path, 'rb') as image_file:
+            if size_bytes is None:
+                size_bytes = os.fstat(image_file.fileno()).st_size
+            return _read_image_header(image_file, file_path, size_bytes)
     except Exception as e:
         logger.error(f"Failed to get image info for {file_path}: {str(e)}")
         return None
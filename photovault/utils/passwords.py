@@ -0,0 +1,99 @@
+# photovault/utils/passwords.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
+
+# Argon2id with an explicit cost point; tune here rather than per call site
+_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+# Each argon2 call uses memory_cost KiB of RAM and a full core; running them on a
+# small shared pool caps that per worker process while request threads wait with
+# the GIL released
+MAX_CONCURRENT_HASHES = 2
+
+# The pool is created on first use and dropped in forked children, so no
+# executor (whose threads do not survive fork) crosses a pre-fork server's fork
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+def _get_hash_pool():
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_HASHES,
+                                                thread_name_prefix='password-hash')
+    return _hash_pool
+
+def _reset_hash_pool():
+    global _hash_pool, _hash_pool_lock
+    _hash_pool = None
+    _hash_pool_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_hash_pool)
+
+ARGON2_PREFIX = '$argon2'
+
+def hash_password(password):
+    """
+    Hash a password with argon2id
+
+    Args:
+        password: Plain-text password
+
+    Returns:
+        str: Encoded argon2 hash
+    """
+    return _get_hash_pool().submit(_hasher.hash, password).result()
+
+# Verified against when the account does not exist, so that unknown
+# usernames cost the same as wrong passwords. Hashed directly so that
+# importing this module never starts the pool
+_DUMMY_HASH = _hasher.hash('photovault-dummy-password')
+
+def verify_password(password_hash, password):
+    """
+    Verify a password against a stored hash
+
+    Accepts argon2 hashes and legacy Werkzeug (pbkdf2/scrypt) hashes.
+    A missing hash is verified against a dummy hash and always fails.
+
+    Args:
+        password_hash: Stored hash, or None when no user was found
+        password: Plain-text password to check
+
+    Returns:
+        bool: True if the password matches
+    """
+    if not password_hash:
+        _verify_argon2(_DUMMY_HASH, password)
+        return False
+
+    if password_hash.startswith(ARGON2_PREFIX):
+        return _verify_argon2(password_hash, password)
+
+    return check_password_hash(password_hash, password)
+
+def needs_rehash(password_hash):
+    """
+    Check whether a stored hash should be upgraded to the current argon2 parameters
+
+    Args:
+        password_hash: Stored hash
+
+    Returns:
+        bool: True for legacy hashes or argon2 hashes with outdated parameters
+    """
+    if not password_hash or not password_hash.startswith(ARGON2_PREFIX):
+        return True
+    return _hasher.check_needs_rehash(password_hash)
+
+def _verify_argon2(password_hash, password):
+    try:
+        return _get_hash_pool().submit(_hasher.verify, password_hash, password).result()
+    except (VerificationError, InvalidHashError):
+        return False
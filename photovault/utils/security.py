@@ -1,13 +1,15 @@
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+# photovault/utils/security.py
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"]
-)
+from flask import current_app, request, session
+from flask_login.config import COOKIE_NAME
 
-# In auth.py routes:
-@auth_bp.route('/login', methods=['GET', 'POST'])
-@limiter.limit("5 per minute")  # Prevent brute force
-def login():
-    # ... existing code
\ No newline at end of file
+def may_be_logged_in():
+    """
+    Check whether the request could belong to a logged-in user
+
+    True when there is a login session, or a remember-me cookie Flask-Login
+    can restore one from. Anonymous visitors have neither, so resolving
+    current_user can be skipped for them.
+    """
+    remember_cookie = current_app.config.get('REMEMBER_COOKIE_NAME', COOKIE_NAME)
+    return bool(session.get('_user_id')) or remember_cookie in request.cookies
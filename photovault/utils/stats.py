@@ -0,0 +1,78 @@
+# photovault/utils/stats.py
+
+from flask import current_app
+from sqlalchemy import func
+from photovault.extensions import db, cache
+from photovault.models import Photo
+
+# Cache backends visible to every worker process. Invalidation only runs in
+# the worker that handled the write, so nothing here is cached per process
+SHARED_CACHE_TYPES = frozenset({'RedisCache', 'RedisSentinelCache', 'RedisClusterCache'})
+
+def _cache_not_shared():
+    return current_app.config.get('CACHE_TYPE') not in SHARED_CACHE_TYPES
+
+@cache.memoize(unless=_cache_not_shared)
+def get_user_photo_stats(user_id):
+    """
+    Get photo statistics for a user
+
+    Cached for CACHE_DEFAULT_TIMEOUT seconds, on a shared backend only.
+    Callers that add, edit or delete a user's photos must call
+    invalidate_user_photo_stats(user_id) afterwards.
+
+    Args:
+        user_id: ID of the photo owner (pass positionally so invalidation matches)
+
+    Returns:
+        tuple: (total_photos, edited_photos, total_size_bytes)
+    """
+    # COUNT(edited_filename) skips photos without an edit
+    row = db.session.query(
+        func.count(Photo.id),
+        func.count(Photo.edited_filename),
+        func.coalesce(func.sum(Photo.file_size), 0)
+    ).filter(Photo.user_id == user_id).one()
+    return tuple(row)
+
+# Number of photos shown in the dashboard's recent photos grid
+RECENT_PHOTOS_LIMIT = 12
+
+@cache.memoize(unless=_cache_not_shared)
+def get_recent_photos(user_id):
+    """
+    Get a user's most recent photos for the dashboard grid
+
+    Cached only on a shared backend. A per-process cache would keep showing
+    deleted photos, or miss new ones, on workers other than the one that
+    handled the change.
+
+    Rows are cached as plain dicts rather than ORM instances, so cached values
+    never carry a session; templates read them with the same attribute syntax.
+
+    Args:
+        user_id: ID of the photo owner (pass positionally so invalidation matches)
+
+    Returns:
+        list: Up to RECENT_PHOTOS_LIMIT dicts, newest first
+    """
+    rows = db.session.query(
+        Photo.id,
+        Photo.user_id,
+        Photo.filename,
+        Photo.original_name,
+        Photo.thumbnail_path,
+        Photo.edited_filename,
+        Photo.created_at
+    ).filter(Photo.user_id == user_id).order_by(Photo.created_at.desc()).limit(RECENT_PHOTOS_LIMIT).all()
+    return [row._asdict() for row in rows]
+
+def invalidate_user_photo_stats(user_id):
+    """
+    Drop the cached photo statistics and recent photos for a user
+
+    Args:
+        user_id: ID of the photo owner
+    """
+    cache.delete_memoized(get_user_photo_stats, user_id)
+    cache.delete_memoized(get_recent_photos, user_id)